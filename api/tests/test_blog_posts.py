@@ -63,8 +63,9 @@ class TestBlogApi(APITestCase):
 
         response = self.client.get(reverse("blog_posts_list"), {"tag": "Test"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.json()["count"], 1)
-        self.assertEqual(response.json()["results"][0]["id"], good_post.id)
+        body = response.json()
+        self.assertEqual(body["count"], 1)
+        self.assertEqual(body["results"][0]["id"], good_post.id)
 
     def test_get_blog_tags_in_use(self):
         """
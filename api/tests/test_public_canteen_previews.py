@@ -2,17 +2,22 @@ import datetime
 import os
 from datetime import date
 
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
 
+from api.views import PublishedCanteensView
+from api.views.utils import UnaccentSearchFilter
 from data.factories import CanteenFactory, DiagnosticFactory, SectorFactory
-from data.models import Canteen
+from data.models import Canteen, CanteenImage, Diagnostic
 from data.region_choices import Region
 
 CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
+PUBLISHED_CANTEENS_URL = reverse("published_canteens")
 
 
 class TestPublicCanteenPreviewsApi(APITestCase):
@@ -30,7 +35,7 @@ class TestPublicCanteenPreviewsApi(APITestCase):
             CanteenFactory.create(),
             CanteenFactory.create(publication_status=Canteen.PublicationStatus.DRAFT.value),
         ]
-        response = self.client.get(reverse("published_canteens"))
+        response = self.client.get(PUBLISHED_CANTEENS_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         body = response.json()
@@ -38,15 +43,16 @@ class TestPublicCanteenPreviewsApi(APITestCase):
 
         results = body.get("results", [])
 
+        result_ids = {x["id"] for x in results}
+
         for published_canteen in published_canteens:
-            self.assertTrue(any(x["id"] == published_canteen.id for x in results))
+            self.assertIn(published_canteen.id, result_ids)
 
         for private_canteen in private_canteens:
-            self.assertFalse(any(x["id"] == private_canteen.id for x in results))
+            self.assertNotIn(private_canteen.id, result_ids)
 
         for recieved_canteen in results:
-            self.assertFalse("managers" in recieved_canteen)
-            self.assertFalse("managerInvitations" in recieved_canteen)
+            self.assertFalse(recieved_canteen.keys() & {"managers", "managerInvitations"})
 
     @override_settings(PUBLISH_BY_DEFAULT=True)
     def test_get_published_canteens(self):
@@ -66,7 +72,11 @@ class TestPublicCanteenPreviewsApi(APITestCase):
                 line_ministry=Canteen.Ministries.ARMEE, publication_status=Canteen.PublicationStatus.PUBLISHED
             ),
         ]
-        response = self.client.get(reverse("published_canteens"))
+        # 6 queries plus 2 per listed canteen. The 6 are the filter options and count, the publicly visible canteens
+        # loaded for the sector options, the sector options themselves, the page and its sector and image prefetches.
+        # The badges and latest appro diagnostic of each of the 3 previews then add one diagnostic lookup each
+        with self.assertNumQueries(12):
+            response = self.client.get(PUBLISHED_CANTEENS_URL)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         body = response.json()
@@ -74,15 +84,16 @@ class TestPublicCanteenPreviewsApi(APITestCase):
 
         results = body.get("results", [])
 
+        result_ids = {x["id"] for x in results}
+
         for published_canteen in published_canteens:
-            self.assertTrue(any(x["id"] == published_canteen.id for x in results))
+            self.assertIn(published_canteen.id, result_ids)
 
         for private_canteen in private_canteens:
-            self.assertFalse(any(x["id"] == private_canteen.id for x in results))
+            self.assertNotIn(private_canteen.id, result_ids)
 
         for recieved_canteen in results:
-            self.assertFalse("managers" in recieved_canteen)
-            self.assertFalse("managerInvitations" in recieved_canteen)
+            self.assertFalse(recieved_canteen.keys() & {"managers", "managerInvitations"})
 
     def test_get_single_public_canteen_preview(self):
         """
@@ -137,14 +148,35 @@ class TestPublicCanteenPreviewsApi(APITestCase):
 
 
 class TestPublicCanteenSearchApi(APITestCase):
-    def test_search_single_result(self):
-        CanteenFactory.create(publication_status="published", name="Shiso")
-        CanteenFactory.create(publication_status="published", name="Wasabi")
-        CanteenFactory.create(publication_status="published", name="Mochi")
-        CanteenFactory.create(publication_status="published", name="Umami")
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = SectorFactory.create(name="School")
+        cls.enterprise = SectorFactory.create(name="Enterprise")
+        cls.social = SectorFactory.create(name="Social")
+        CanteenFactory.create_batch_with_sectors(
+            [
+                (
+                    dict(publication_status="published", name="Shiso", daily_meal_count=10, department="69"),
+                    [cls.school],
+                ),
+                (
+                    dict(publication_status="published", name="Wasabi", daily_meal_count=15, department="10"),
+                    [cls.enterprise],
+                ),
+                (
+                    dict(publication_status="published", name="Mochi", daily_meal_count=20, department="75"),
+                    [cls.social],
+                ),
+                (
+                    dict(publication_status="published", name="Umami", daily_meal_count=25, department="31"),
+                    [cls.school, cls.social],
+                ),
+            ]
+        )
 
+    def test_search_single_result(self):
         search_term = "mochi"
-        response = self.client.get(f"{reverse('published_canteens')}?search={search_term}")
+        response = self.client.get(f"{PUBLISHED_CANTEENS_URL}?search={search_term}")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         results = response.json().get("results", [])
@@ -153,11 +185,15 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertEqual(results[0].get("name"), "Mochi")
 
     def test_search_accented_result(self):
-        CanteenFactory.create(publication_status="published", name="Wakamé")
-        CanteenFactory.create(publication_status="published", name="Shiitaké")
+        CanteenFactory.create_bare_batch(
+            [
+                dict(publication_status="published", name="Wakamé"),
+                dict(publication_status="published", name="Shiitaké"),
+            ]
+        )
 
         search_term = "wakame"
-        response = self.client.get(f"{reverse('published_canteens')}?search={search_term}")
+        response = self.client.get(f"{PUBLISHED_CANTEENS_URL}?search={search_term}")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         results = response.json().get("results", [])
@@ -166,34 +202,39 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertEqual(results[0].get("name"), "Wakamé")
 
     def test_search_multiple_results(self):
-        CanteenFactory.create(publication_status="published", name="Sudachi")
-        CanteenFactory.create(publication_status="published", name="Wasabi")
-        CanteenFactory.create(publication_status="published", name="Mochi")
-        CanteenFactory.create(publication_status="published", name="Umami")
+        CanteenFactory.create_bare_batch([dict(publication_status="published", name="Sudachi")])
 
         search_term = "chi"
-        response = self.client.get(f"{reverse('published_canteens')}?search={search_term}")
+        response = self.client.get(f"{PUBLISHED_CANTEENS_URL}?search={search_term}")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         results = response.json().get("results", [])
 
         self.assertEqual(len(results), 2)
 
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Mochi", result_names)
-        self.assertIn("Sudachi", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Mochi", "Sudachi"})
 
-    def test_meal_count_filter(self):
-        CanteenFactory.create(publication_status="published", daily_meal_count=10, name="Shiso")
-        CanteenFactory.create(publication_status="published", daily_meal_count=15, name="Wasabi")
-        CanteenFactory.create(publication_status="published", daily_meal_count=20, name="Mochi")
-        CanteenFactory.create(publication_status="published", daily_meal_count=25, name="Umami")
+    def test_search_uses_trigram_indexes(self):
+        """
+        The name OR siret search should be answerable from the trigram indexes on both fields
+        """
+        request = Request(APIRequestFactory().get(PUBLISHED_CANTEENS_URL, {"search": "mochi"}))
+        queryset = UnaccentSearchFilter().filter_queryset(request, Canteen.objects.all(), PublishedCanteensView())
 
+        with connection.cursor() as cursor:
+            # the test table is tiny, force the planner to show whether the indexes can be used at all
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+
+        self.assertIn("data_canteen_name_trgm_idx", plan)
+        self.assertIn("data_canteen_siret_trgm_idx", plan)
+
+    def test_meal_count_filter(self):
         # Only "Shiso" is between 9 and 11 meal count
         min_meal_count = 9
         max_meal_count = 11
         query_params = f"min_daily_meal_count={min_meal_count}&max_daily_meal_count={max_meal_count}"
-        url = f"{reverse('published_canteens')}?{query_params}"
+        url = f"{PUBLISHED_CANTEENS_URL}?{query_params}"
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -205,20 +246,18 @@ class TestPublicCanteenSearchApi(APITestCase):
         min_meal_count = 9
         max_meal_count = 15
         query_params = f"min_daily_meal_count={min_meal_count}&max_daily_meal_count={max_meal_count}"
-        url = f"{reverse('published_canteens')}?{query_params}"
+        url = f"{PUBLISHED_CANTEENS_URL}?{query_params}"
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 2)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Wasabi", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Wasabi"})
 
         # No canteen has less than 5 meal count
         max_meal_count = 5
         query_params = f"max_daily_meal_count={max_meal_count}"
-        url = f"{reverse('published_canteens')}?{query_params}"
+        url = f"{PUBLISHED_CANTEENS_URL}?{query_params}"
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -228,7 +267,7 @@ class TestPublicCanteenSearchApi(APITestCase):
         # Filters are inclusive, so a value of 25 brings "Umami"
         min_meal_count = 25
         query_params = f"min_daily_meal_count={min_meal_count}"
-        url = f"{reverse('published_canteens')}?{query_params}"
+        url = f"{PUBLISHED_CANTEENS_URL}?{query_params}"
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -237,80 +276,100 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertEqual(results[0].get("name"), "Umami")
 
     def test_department_filter(self):
-        CanteenFactory.create(publication_status="published", department="69", name="Shiso")
-        CanteenFactory.create(publication_status="published", department="10", name="Wasabi")
-        CanteenFactory.create(publication_status="published", department="75", name="Mochi")
-        CanteenFactory.create(publication_status="published", department="31", name="Umami")
-
-        url = f"{reverse('published_canteens')}?department=69"
+        url = f"{PUBLISHED_CANTEENS_URL}?department=69"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].get("name"), "Shiso")
 
     def test_sectors_filter(self):
-        school = SectorFactory.create(name="School")
-        enterprise = SectorFactory.create(name="Enterprise")
-        social = SectorFactory.create(name="Social")
-        CanteenFactory.create(publication_status="published", sectors=[school], name="Shiso")
-        CanteenFactory.create(publication_status="published", sectors=[enterprise], name="Wasabi")
-        CanteenFactory.create(publication_status="published", sectors=[social], name="Mochi")
-        CanteenFactory.create(publication_status="published", sectors=[school, social], name="Umami")
-
-        url = f"{reverse('published_canteens')}?sectors={school.id}"
-        response = self.client.get(url)
+        url = f"{PUBLISHED_CANTEENS_URL}?sectors={self.school.id}"
+        # test_get_published_canteens' 6 queries plus the lookup of the requested sectors, then 2 per result
+        with self.assertNumQueries(11):
+            response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 2)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Umami", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Umami"})
 
-        url = f"{reverse('published_canteens')}?sectors={enterprise.id}"
-        response = self.client.get(url)
+        url = f"{PUBLISHED_CANTEENS_URL}?sectors={self.enterprise.id}"
+        with self.assertNumQueries(9):
+            response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0].get("name"), "Wasabi")
 
-        url = f"{reverse('published_canteens')}?sectors={enterprise.id}&sectors={social.id}"
-        response = self.client.get(url)
+        url = f"{PUBLISHED_CANTEENS_URL}?sectors={self.enterprise.id}&sectors={self.social.id}"
+        with self.assertNumQueries(13):
+            response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 3)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Wasabi", result_names)
-        self.assertIn("Mochi", result_names)
-        self.assertIn("Umami", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Wasabi", "Mochi", "Umami"})
+
+    def test_related_objects_prefetched(self):
+        """
+        The amount of queries should not depend on the number of sectors or images of the listed canteens
+        """
+        with CaptureQueriesContext(connection) as initial_queries:
+            response = self.client.get(PUBLISHED_CANTEENS_URL)
+        self.assertEqual(len(response.json().get("results", [])), 4)
+
+        CanteenSector = Canteen.sectors.through
+        extra_sectors = SectorFactory.create_batch(3)
+        canteens = list(Canteen.objects.all())
+        CanteenSector.objects.bulk_create(
+            [CanteenSector(canteen=canteen, sector=sector) for canteen in canteens for sector in extra_sectors]
+        )
+        CanteenImage.objects.bulk_create(
+            [CanteenImage(canteen=canteen, image=f"image-{i}.png") for canteen in canteens for i in range(3)]
+        )
+
+        with self.assertNumQueries(len(initial_queries)):
+            response = self.client.get(PUBLISHED_CANTEENS_URL)
+        results = response.json().get("results", [])
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertIsNotNone(result["leadImage"])
+
+
+class TestPublicCanteenListingApi(APITestCase):
+    # diagnostics are published for the previous year
+    publication_year = date.today().year - 1
 
     def test_order_search(self):
         """
         By default, list canteens by creation date descending
         Optionally sort by name, modification date, number of meals
         """
-        CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=200,
-            name="Shiso",
-            creation_date=(timezone.now() - datetime.timedelta(days=10)),
-        )
-        CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=100,
-            name="Wasabi",
-            creation_date=(timezone.now() - datetime.timedelta(days=8)),
-        )
-        last_modified = CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=300,
-            name="Mochi",
-            creation_date=(timezone.now() - datetime.timedelta(days=6)),
-        )
-        CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=150,
-            name="Umami",
-            creation_date=(timezone.now() - datetime.timedelta(days=4)),
+        _, _, last_modified, _ = CanteenFactory.create_bare_batch(
+            [
+                dict(
+                    publication_status="published",
+                    daily_meal_count=200,
+                    name="Shiso",
+                    creation_date=(timezone.now() - datetime.timedelta(days=10)),
+                ),
+                dict(
+                    publication_status="published",
+                    daily_meal_count=100,
+                    name="Wasabi",
+                    creation_date=(timezone.now() - datetime.timedelta(days=8)),
+                ),
+                dict(
+                    publication_status="published",
+                    daily_meal_count=300,
+                    name="Mochi",
+                    creation_date=(timezone.now() - datetime.timedelta(days=6)),
+                ),
+                dict(
+                    publication_status="published",
+                    daily_meal_count=150,
+                    name="Umami",
+                    creation_date=(timezone.now() - datetime.timedelta(days=4)),
+                ),
+            ]
         )
 
-        url = f"{reverse('published_canteens')}"
+        url = PUBLISHED_CANTEENS_URL
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 4)
@@ -319,7 +378,7 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertEqual(results[2]["name"], "Wasabi")
         self.assertEqual(results[3]["name"], "Shiso")
 
-        url = f"{reverse('published_canteens')}?ordering=name"
+        url = f"{PUBLISHED_CANTEENS_URL}?ordering=name"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 4)
@@ -331,7 +390,7 @@ class TestPublicCanteenSearchApi(APITestCase):
         last_modified.daily_meal_count = 900
         last_modified.save()
 
-        url = f"{reverse('published_canteens')}?ordering=-modification_date"
+        url = f"{PUBLISHED_CANTEENS_URL}?ordering=-modification_date"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 4)
@@ -340,7 +399,7 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertEqual(results[2]["name"], "Wasabi")
         self.assertEqual(results[3]["name"], "Shiso")
 
-        url = f"{reverse('published_canteens')}?ordering=daily_meal_count"
+        url = f"{PUBLISHED_CANTEENS_URL}?ordering=daily_meal_count"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 4)
@@ -353,32 +412,36 @@ class TestPublicCanteenSearchApi(APITestCase):
         """
         In meal count, "null" values should be placed first
         """
-        CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=None,
-            name="Shiso",
-            creation_date=(timezone.now() - datetime.timedelta(days=10)),
-        )
-        CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=0,
-            name="Wasabi",
-            creation_date=(timezone.now() - datetime.timedelta(days=8)),
-        )
-        CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=1,
-            name="Mochi",
-            creation_date=(timezone.now() - datetime.timedelta(days=6)),
-        )
-        CanteenFactory.create(
-            publication_status="published",
-            daily_meal_count=2,
-            name="Umami",
-            creation_date=(timezone.now() - datetime.timedelta(days=4)),
+        CanteenFactory.create_bare_batch(
+            [
+                dict(
+                    publication_status="published",
+                    daily_meal_count=None,
+                    name="Shiso",
+                    creation_date=(timezone.now() - datetime.timedelta(days=10)),
+                ),
+                dict(
+                    publication_status="published",
+                    daily_meal_count=0,
+                    name="Wasabi",
+                    creation_date=(timezone.now() - datetime.timedelta(days=8)),
+                ),
+                dict(
+                    publication_status="published",
+                    daily_meal_count=1,
+                    name="Mochi",
+                    creation_date=(timezone.now() - datetime.timedelta(days=6)),
+                ),
+                dict(
+                    publication_status="published",
+                    daily_meal_count=2,
+                    name="Umami",
+                    creation_date=(timezone.now() - datetime.timedelta(days=4)),
+                ),
+            ]
         )
 
-        url = f"{reverse('published_canteens')}?ordering=daily_meal_count"
+        url = f"{PUBLISHED_CANTEENS_URL}?ordering=daily_meal_count"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 4)
@@ -387,7 +450,7 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertEqual(results[2]["name"], "Mochi")
         self.assertEqual(results[3]["name"], "Umami")
 
-        url = f"{reverse('published_canteens')}?ordering=-daily_meal_count"
+        url = f"{PUBLISHED_CANTEENS_URL}?ordering=-daily_meal_count"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 4)
@@ -435,141 +498,130 @@ class TestPublicCanteenSearchApi(APITestCase):
             publication_status=Canteen.PublicationStatus.PUBLISHED, region=Region.guadeloupe, name="Guadeloupe"
         )
 
-        publication_year = date.today().year - 1
-
-        DiagnosticFactory.create(
-            canteen=good_canteen,
-            year=publication_year,
-            value_total_ht=100,
-            value_bio_ht=30,
-            value_sustainable_ht=10,
-            value_externality_performance_ht=10,
-            value_egalim_others_ht=10,
-        )
-        DiagnosticFactory.create(
-            canteen=central,
-            year=publication_year,
-            value_total_ht=100,
-            value_bio_ht=30,
-            value_sustainable_ht=10,
-            value_externality_performance_ht=10,
-            value_egalim_others_ht=10,
+        Diagnostic.objects.bulk_create(
+            [
+                DiagnosticFactory.build(
+                    canteen=good_canteen,
+                    year=self.publication_year,
+                    value_total_ht=100,
+                    value_bio_ht=30,
+                    value_sustainable_ht=10,
+                    value_externality_performance_ht=10,
+                    value_egalim_others_ht=10,
+                ),
+                DiagnosticFactory.build(
+                    canteen=central,
+                    year=self.publication_year,
+                    value_total_ht=100,
+                    value_bio_ht=30,
+                    value_sustainable_ht=10,
+                    value_externality_performance_ht=10,
+                    value_egalim_others_ht=10,
+                ),
+                DiagnosticFactory.build(
+                    canteen=secretly_good_canteen,
+                    year=self.publication_year,
+                    value_total_ht=100,
+                    value_bio_ht=30,
+                    value_sustainable_ht=30,
+                    value_externality_performance_ht=0,
+                    value_egalim_others_ht=0,
+                ),
+                DiagnosticFactory.build(
+                    canteen=medium_canteen,
+                    year=self.publication_year,
+                    value_total_ht=1000,
+                    value_bio_ht=150,
+                    value_sustainable_ht=350,
+                    value_externality_performance_ht=None,
+                    value_egalim_others_ht=None,
+                ),
+                DiagnosticFactory.build(
+                    canteen=sustainable_canteen,
+                    year=self.publication_year,
+                    value_total_ht=100,
+                    value_bio_ht=None,
+                    value_sustainable_ht=None,
+                    value_externality_performance_ht=40,
+                    value_egalim_others_ht=20,
+                ),
+                DiagnosticFactory.build(
+                    canteen=bad_canteen,
+                    year=2019,
+                    value_total_ht=100,
+                    value_bio_ht=30,
+                    value_sustainable_ht=30,
+                    value_externality_performance_ht=0,
+                    value_egalim_others_ht=0,
+                ),
+                DiagnosticFactory.build(
+                    canteen=bad_canteen,
+                    year=self.publication_year,
+                    value_total_ht=10,
+                    value_bio_ht=0,
+                    value_sustainable_ht=0,
+                    value_externality_performance_ht=0,
+                    value_egalim_others_ht=0,
+                ),
+                DiagnosticFactory.build(
+                    canteen=guadeloupe_canteen,
+                    year=self.publication_year,
+                    value_total_ht=100,
+                    value_bio_ht=5,
+                    value_sustainable_ht=15,
+                    value_externality_performance_ht=None,
+                    value_egalim_others_ht=0,
+                ),
+            ]
         )
-        DiagnosticFactory.create(
-            canteen=secretly_good_canteen,
-            year=publication_year,
-            value_total_ht=100,
-            value_bio_ht=30,
-            value_sustainable_ht=30,
-            value_externality_performance_ht=0,
-            value_egalim_others_ht=0,
-        )
-        DiagnosticFactory.create(
-            canteen=medium_canteen,
-            year=publication_year,
-            value_total_ht=1000,
-            value_bio_ht=150,
-            value_sustainable_ht=350,
-            value_externality_performance_ht=None,
-            value_egalim_others_ht=None,
-        )
-        DiagnosticFactory.create(
-            canteen=sustainable_canteen,
-            year=publication_year,
-            value_total_ht=100,
-            value_bio_ht=None,
-            value_sustainable_ht=None,
-            value_externality_performance_ht=40,
-            value_egalim_others_ht=20,
-        )
-        DiagnosticFactory.create(
-            canteen=bad_canteen,
-            year=2019,
-            value_total_ht=100,
-            value_bio_ht=30,
-            value_sustainable_ht=30,
-            value_externality_performance_ht=0,
-            value_egalim_others_ht=0,
-        )
-        DiagnosticFactory.create(
-            canteen=bad_canteen,
-            year=publication_year,
-            value_total_ht=10,
-            value_bio_ht=0,
-            value_sustainable_ht=0,
-            value_externality_performance_ht=0,
-            value_egalim_others_ht=0,
-        )
-        DiagnosticFactory.create(
-            canteen=guadeloupe_canteen,
-            year=publication_year,
-            value_total_ht=100,
-            value_bio_ht=5,
-            value_sustainable_ht=15,
-            value_externality_performance_ht=None,
-            value_egalim_others_ht=0,
-        )
-        url = f"{reverse('published_canteens')}?min_portion_bio={0.2}"
+        url = f"{PUBLISHED_CANTEENS_URL}?min_portion_bio={0.2}"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 2)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Satellite", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Satellite"})
 
-        url = f"{reverse('published_canteens')}?min_portion_combined={0.5}"
+        url = f"{PUBLISHED_CANTEENS_URL}?min_portion_combined={0.5}"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 4)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Satellite", result_names)
-        self.assertIn("Wasabi", result_names)
-        self.assertIn("Umami", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Satellite", "Wasabi", "Umami"})
 
-        url = f"{reverse('published_canteens')}?min_portion_bio={0.1}&min_portion_combined={0.5}"
+        url = f"{PUBLISHED_CANTEENS_URL}?min_portion_bio={0.1}&min_portion_combined={0.5}"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 3)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Satellite", result_names)
-        self.assertIn("Wasabi", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Satellite", "Wasabi"})
 
-        url = f"{reverse('published_canteens')}?badge=appro"
+        url = f"{PUBLISHED_CANTEENS_URL}?badge=appro"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 3)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Satellite", result_names)
-        self.assertIn("Guadeloupe", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Satellite", "Guadeloupe"})
 
         # if both badge and thresholds specified, return the results that match the most strict threshold
-        url = f"{reverse('published_canteens')}?badge=appro&min_portion_combined={0.01}"
+        url = f"{PUBLISHED_CANTEENS_URL}?badge=appro&min_portion_combined={0.01}"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 3)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Satellite", result_names)
-        self.assertIn("Guadeloupe", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Satellite", "Guadeloupe"})
 
-        url = f"{reverse('published_canteens')}?badge=appro&min_portion_combined={0.5}"
+        url = f"{PUBLISHED_CANTEENS_URL}?badge=appro&min_portion_combined={0.5}"
         response = self.client.get(url)
         results = response.json().get("results", [])
         self.assertEqual(len(results), 2)
-        result_names = list(map(lambda x: x.get("name"), results))
-        self.assertIn("Shiso", result_names)
-        self.assertIn("Satellite", result_names)
+        self.assertEqual({x["name"] for x in results}, {"Shiso", "Satellite"})
 
     def test_pagination_departments(self):
-        CanteenFactory.create(publication_status="published", department="75", name="Shiso")
-        CanteenFactory.create(publication_status="published", department="75", name="Wasabi")
-        CanteenFactory.create(publication_status="published", department="69", name="Mochi")
-        CanteenFactory.create(publication_status="published", department=None, name="Umami")
+        CanteenFactory.create_bare_batch(
+            [
+                dict(publication_status="published", department="75", name="Shiso"),
+                dict(publication_status="published", department="75", name="Wasabi"),
+                dict(publication_status="published", department="69", name="Mochi"),
+                dict(publication_status="published", department=None, name="Umami"),
+            ]
+        )
 
-        url = f"{reverse('published_canteens')}"
+        url = PUBLISHED_CANTEENS_URL
         response = self.client.get(url)
         body = response.json()
 
@@ -587,12 +639,16 @@ class TestPublicCanteenSearchApi(APITestCase):
         administration = SectorFactory.create(name="Administration")
         # unused sectors shouldn't show up as an option
         SectorFactory.create(name="Unused")
-        CanteenFactory.create(publication_status="published", sectors=[school, enterprise], name="Shiso")
-        CanteenFactory.create(publication_status="published", sectors=[school], name="Wasabi")
-        CanteenFactory.create(publication_status="published", sectors=[school], name="Mochi")
-        CanteenFactory.create(publication_status="published", sectors=[administration], name="Umami")
+        CanteenFactory.create_batch_with_sectors(
+            [
+                (dict(publication_status="published", name="Shiso"), [school, enterprise]),
+                (dict(publication_status="published", name="Wasabi"), [school]),
+                (dict(publication_status="published", name="Mochi"), [school]),
+                (dict(publication_status="published", name="Umami"), [administration]),
+            ]
+        )
 
-        url = f"{reverse('published_canteens')}"
+        url = PUBLISHED_CANTEENS_URL
         response = self.client.get(url)
         body = response.json()
 
@@ -601,7 +657,7 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertIn(enterprise.id, body.get("sectors"))
         self.assertIn(administration.id, body.get("sectors"))
 
-        url = f"{reverse('published_canteens')}?sectors={enterprise.id}"
+        url = f"{PUBLISHED_CANTEENS_URL}?sectors={enterprise.id}"
         response = self.client.get(url)
         body = response.json()
 
@@ -621,12 +677,15 @@ class TestPublicCanteenSearchApi(APITestCase):
         administration = SectorFactory.create(name="Administration")
         # unused sectors shouldn't show up as an option
         unused = SectorFactory.create(name="Unused")
-        CanteenFactory.create(line_ministry=None, sectors=[school, enterprise], name="Shiso")
-        CanteenFactory.create(line_ministry=None, sectors=[school, administration], name="Umami")
-
-        CanteenFactory.create(line_ministry=Canteen.Ministries.ARMEE, sectors=[unused], name="Secret")
+        CanteenFactory.create_batch_with_sectors(
+            [
+                (dict(line_ministry=None, name="Shiso"), [school, enterprise]),
+                (dict(line_ministry=None, name="Umami"), [school, administration]),
+                (dict(line_ministry=Canteen.Ministries.ARMEE, name="Secret"), [unused]),
+            ]
+        )
 
-        url = f"{reverse('published_canteens')}"
+        url = PUBLISHED_CANTEENS_URL
         response = self.client.get(url)
         body = response.json()
 
@@ -635,7 +694,7 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertIn(enterprise.id, body.get("sectors"))
         self.assertIn(administration.id, body.get("sectors"))
 
-        url = f"{reverse('published_canteens')}?sectors={enterprise.id}"
+        url = f"{PUBLISHED_CANTEENS_URL}?sectors={enterprise.id}"
         response = self.client.get(url)
         body = response.json()
 
@@ -645,10 +704,14 @@ class TestPublicCanteenSearchApi(APITestCase):
         self.assertIn(administration.id, body.get("sectors"))
 
     def test_pagination_management_types(self):
-        CanteenFactory.create(publication_status="published", management_type="conceded", name="Shiso")
-        CanteenFactory.create(publication_status="published", management_type=None, name="Wasabi")
+        CanteenFactory.create_bare_batch(
+            [
+                dict(publication_status="published", management_type="conceded", name="Shiso"),
+                dict(publication_status="published", management_type=None, name="Wasabi"),
+            ]
+        )
 
-        url = f"{reverse('published_canteens')}"
+        url = PUBLISHED_CANTEENS_URL
         response = self.client.get(url)
         body = response.json()
 
@@ -662,12 +725,11 @@ class TestPublicCanteenSearchApi(APITestCase):
             publication_status="published", production_type="central_serving"
         )
 
-        response = self.client.get(f"{reverse('published_canteens')}?production_type=central,central_serving")
+        response = self.client.get(f"{PUBLISHED_CANTEENS_URL}?production_type=central,central_serving")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         body = response.json()
 
         self.assertEqual(body["count"], 2)
-        ids = list(map(lambda x: x["id"], body["results"]))
-        self.assertIn(central_cuisine.id, ids)
-        self.assertIn(central_serving_cuisine.id, ids)
+        ids = {x["id"] for x in body["results"]}
+        self.assertEqual(ids, {central_cuisine.id, central_serving_cuisine.id})
         self.assertNotIn(site_canteen.id, ids)
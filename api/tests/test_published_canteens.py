@@ -1,11 +1,12 @@
-import os
+from unittest import mock
 
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from api.serializers import PublicApproDiagnosticSerializer
 from data.factories import (
     CanteenFactory,
     DiagnosticFactory,
@@ -16,11 +17,27 @@ from data.models import Canteen, CanteenImage, Diagnostic, Teledeclaration
 
 from .utils import authenticate
 
-CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
+# A valid 1x1 white PNG, small enough to skip any resizing in CanteenImage.save
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de"
+    "0000000c4944415478da63f8ffff3f0005fe02fe331295140000000049454e44ae426082"
+)
 
 
 @override_settings(PUBLISH_BY_DEFAULT=False)
 class TestPublishedCanteenApi(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        central_siret = "22730656663081"
+        cls.central_kitchen = CanteenFactory.create(
+            siret=central_siret, production_type=Canteen.ProductionType.CENTRAL
+        )
+        cls.satellite = CanteenFactory.create(
+            central_producer_siret=central_siret,
+            publication_status="published",
+            production_type=Canteen.ProductionType.ON_SITE_CENTRAL,
+        )
+
     @authenticate
     def test_canteen_publication_fields_read_only(self):
         """
@@ -46,7 +63,7 @@ class TestPublishedCanteenApi(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         body = response.json()
-        self.assertEqual(body.get("id"), published_canteen.id)
+        self.assertEqual(body["id"], published_canteen.id)
 
     def test_get_single_unpublished_canteen(self):
         """
@@ -68,42 +85,25 @@ class TestPublishedCanteenApi(APITestCase):
         self.assertIn("badges", body)
 
     @authenticate
+    @override_settings(STORAGES={"default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}})
     def test_canteen_image_serialization(self):
         """
         A canteen with images should serialize those images
         """
         canteen = CanteenFactory.create(publication_status=Canteen.PublicationStatus.PUBLISHED.value)
-        image_names = [
-            "test-image-1.jpg",
-            "test-image-2.jpg",
-            "test-image-3.png",
-        ]
-        for image_name in image_names:
-            path = os.path.join(CURRENT_DIR, f"files/{image_name}")
-            with open(path, "rb") as image:
-                file = File(image)
-                file.name = image_name
-                canteen_image = CanteenImage(image=file)
-                canteen_image.canteen = canteen
-                canteen_image.save()
+        for image_name in ["test-image-1.png", "test-image-2.png", "test-image-3.png"]:
+            CanteenImage.objects.create(canteen=canteen, image=ContentFile(TINY_PNG, name=image_name))
 
-        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": canteen.id}))
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse("single_published_canteen", kwargs={"pk": canteen.id}))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         body = response.json()
-        self.assertEqual(len(body.get("images")), 3)
+        self.assertEqual(len(body["images"]), 3)
 
     def test_satellite_published(self):
-        central_siret = "22730656663081"
-        central_kitchen = CanteenFactory.create(siret=central_siret, production_type=Canteen.ProductionType.CENTRAL)
-        satellite = CanteenFactory.create(
-            central_producer_siret=central_siret,
-            publication_status="published",
-            production_type=Canteen.ProductionType.ON_SITE_CENTRAL,
-        )
-
         diagnostic = DiagnosticFactory.create(
-            canteen=central_kitchen,
+            canteen=self.central_kitchen,
             year=2020,
             value_total_ht=1200,
             value_bio_ht=600,
@@ -111,30 +111,22 @@ class TestPublishedCanteenApi(APITestCase):
             central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
         )
 
-        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": satellite.id}))
+        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": self.satellite.id}))
         body = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        self.assertEqual(body.get("id"), satellite.id)
-        self.assertEqual(len(body.get("approDiagnostics")), 1)
-        self.assertEqual(body.get("centralKitchen").get("id"), central_kitchen.id)
+        self.assertEqual(body["id"], self.satellite.id)
+        self.assertEqual(len(body["approDiagnostics"]), 1)
+        self.assertEqual(body["centralKitchen"]["id"], self.central_kitchen.id)
 
-        serialized_diagnostic = body.get("approDiagnostics")[0]
+        serialized_diagnostic = body["approDiagnostics"][0]
         self.assertEqual(serialized_diagnostic["id"], diagnostic.id)
         self.assertEqual(serialized_diagnostic["percentageValueTotalHt"], 1)
         self.assertEqual(serialized_diagnostic["percentageValueBioHt"], 0.5)
 
     def test_satellite_published_without_bio(self):
-        central_siret = "22730656663081"
-        central_kitchen = CanteenFactory.create(siret=central_siret, production_type=Canteen.ProductionType.CENTRAL)
-        satellite = CanteenFactory.create(
-            central_producer_siret=central_siret,
-            publication_status="published",
-            production_type=Canteen.ProductionType.ON_SITE_CENTRAL,
-        )
-
         diagnostic = DiagnosticFactory.create(
-            canteen=central_kitchen,
+            canteen=self.central_kitchen,
             year=2020,
             value_total_ht=1200,
             value_bio_ht=None,
@@ -142,14 +134,14 @@ class TestPublishedCanteenApi(APITestCase):
             central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
         )
 
-        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": satellite.id}))
+        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": self.satellite.id}))
         body = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        self.assertEqual(body.get("id"), satellite.id)
-        self.assertEqual(len(body.get("approDiagnostics")), 1)
+        self.assertEqual(body["id"], self.satellite.id)
+        self.assertEqual(len(body["approDiagnostics"]), 1)
 
-        serialized_diagnostic = body.get("approDiagnostics")[0]
+        serialized_diagnostic = body["approDiagnostics"][0]
         self.assertEqual(serialized_diagnostic["id"], diagnostic.id)
         self.assertEqual(serialized_diagnostic["percentageValueTotalHt"], 1)
         self.assertNotIn("percentageValueBioHt", serialized_diagnostic)
@@ -159,16 +151,8 @@ class TestPublishedCanteenApi(APITestCase):
         Central cuisine diagnostics should only be returned if their central_kitchen_diagnostic_mode
         is set. Otherwise it may be an old diagnostic that is not meant for the satellites
         """
-        central_siret = "22730656663081"
-        central_kitchen = CanteenFactory.create(siret=central_siret, production_type=Canteen.ProductionType.CENTRAL)
-        satellite = CanteenFactory.create(
-            central_producer_siret=central_siret,
-            publication_status="published",
-            production_type=Canteen.ProductionType.ON_SITE_CENTRAL,
-        )
-
         DiagnosticFactory.create(
-            canteen=central_kitchen,
+            canteen=self.central_kitchen,
             year=2020,
             value_total_ht=1200,
             value_bio_ht=600,
@@ -176,56 +160,51 @@ class TestPublishedCanteenApi(APITestCase):
             central_kitchen_diagnostic_mode=None,
         )
 
-        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": satellite.id}))
+        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": self.satellite.id}))
         body = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        self.assertEqual(body.get("id"), satellite.id)
-        self.assertEqual(len(body.get("approDiagnostics")), 0)
+        self.assertEqual(body["id"], self.satellite.id)
+        self.assertEqual(len(body["approDiagnostics"]), 0)
 
     def test_satellite_published_needed_fields(self):
         """
         If the central kitchen diag is set to APPRO, only the appro fields should be included.
         If the central kitchen diag is set to ALL, every fields should be included.
         """
-        central_siret = "22730656663081"
-        central_kitchen = CanteenFactory.create(siret=central_siret, production_type=Canteen.ProductionType.CENTRAL)
-        satellite = CanteenFactory.create(
-            central_producer_siret=central_siret,
-            publication_status="published",
-            production_type=Canteen.ProductionType.ON_SITE_CENTRAL,
+        Diagnostic.objects.bulk_create(
+            [
+                DiagnosticFactory.build(
+                    canteen=self.central_kitchen,
+                    year=2020,
+                    value_total_ht=1200,
+                    value_bio_ht=600,
+                    diagnostic_type=Diagnostic.DiagnosticType.SIMPLE,
+                    central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
+                ),
+                DiagnosticFactory.build(
+                    canteen=self.central_kitchen,
+                    year=2021,
+                    value_total_ht=1200,
+                    value_bio_ht=600,
+                    diagnostic_type=Diagnostic.DiagnosticType.SIMPLE,
+                    central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.ALL,
+                    value_fish_ht=100,
+                    value_fish_egalim_ht=80,
+                ),
+            ]
         )
 
-        DiagnosticFactory.create(
-            canteen=central_kitchen,
-            year=2020,
-            value_total_ht=1200,
-            value_bio_ht=600,
-            diagnostic_type=Diagnostic.DiagnosticType.SIMPLE,
-            central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
-        )
-
-        DiagnosticFactory.create(
-            canteen=central_kitchen,
-            year=2021,
-            value_total_ht=1200,
-            value_bio_ht=600,
-            diagnostic_type=Diagnostic.DiagnosticType.SIMPLE,
-            central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.ALL,
-            value_fish_ht=100,
-            value_fish_egalim_ht=80,
-        )
-
-        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": satellite.id}))
+        response = self.client.get(reverse("single_published_canteen", kwargs={"pk": self.satellite.id}))
         body = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        self.assertEqual(len(body.get("approDiagnostics")), 2)
-        self.assertEqual(len(body.get("serviceDiagnostics")), 1)
-        appro_diagnostics = body.get("approDiagnostics")
-        appro_diag_2020 = next(filter(lambda x: x["year"] == 2020, appro_diagnostics))
-        appro_diag_2021 = next(filter(lambda x: x["year"] == 2021, appro_diagnostics))
-        service_diag_2021 = body.get("serviceDiagnostics")[0]
+        self.assertEqual(len(body["approDiagnostics"]), 2)
+        self.assertEqual(len(body["serviceDiagnostics"]), 1)
+        appro_diagnostics = {diagnostic["year"]: diagnostic for diagnostic in body["approDiagnostics"]}
+        appro_diag_2020 = appro_diagnostics[2020]
+        appro_diag_2021 = appro_diagnostics[2021]
+        service_diag_2021 = body["serviceDiagnostics"][0]
 
         self.assertIn("percentageValueTotalHt", appro_diag_2020)
         self.assertNotIn("hasWasteDiagnostic", appro_diag_2020)
@@ -235,6 +214,31 @@ class TestPublishedCanteenApi(APITestCase):
         self.assertNotIn("valueFishEgalimHt", appro_diag_2021)
         self.assertIn("percentageValueFishEgalimHt", appro_diag_2021)
 
+    def test_appro_diagnostic_fields_discovered_once(self):
+        """
+        The nested diagnostics share a single child serializer, so their fields are only
+        built once per response rather than once per diagnostic
+        """
+        canteen = CanteenFactory.create(
+            production_type=Canteen.ProductionType.ON_SITE,
+            publication_status="published",
+        )
+        Diagnostic.objects.bulk_create(
+            [
+                DiagnosticFactory.build(canteen=canteen, year=year, diagnostic_type=Diagnostic.DiagnosticType.SIMPLE)
+                for year in [2020, 2021, 2022]
+            ]
+        )
+
+        get_fields = PublicApproDiagnosticSerializer.get_fields
+        with mock.patch.object(
+            PublicApproDiagnosticSerializer, "get_fields", autospec=True, side_effect=get_fields
+        ) as mocked_get_fields:
+            response = self.client.get(reverse("single_published_canteen", kwargs={"pk": canteen.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["approDiagnostics"]), 3)
+        self.assertEqual(mocked_get_fields.call_count, 1)
+
     def test_percentage_values(self):
         """
         The published endpoint should not contain the real economic data, only percentages.
@@ -261,22 +265,28 @@ class TestPublishedCanteenApi(APITestCase):
         body = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        self.assertEqual(len(body.get("approDiagnostics")), 1)
-        serialized_diag = body.get("approDiagnostics")[0]
+        self.assertEqual(len(body["approDiagnostics"]), 1)
+        serialized_diag = body["approDiagnostics"][0]
 
-        self.assertEqual(serialized_diag["percentageValueTotalHt"], 1)
-        self.assertEqual(serialized_diag["percentageValueBioHt"], 0.5)
-        self.assertEqual(serialized_diag["percentageValueSustainableHt"], 0.25)
-        # the following is a percentage of the meat total, not global total
-        self.assertEqual(serialized_diag["percentageValueMeatPoultryEgalimHt"], 0.5)
-        self.assertEqual(serialized_diag["percentageValueFishEgalimHt"], 0.8)
+        expected_percentages = {
+            "percentageValueTotalHt": 1,
+            "percentageValueBioHt": 0.5,
+            "percentageValueSustainableHt": 0.25,
+            # the following is a percentage of the meat total, not global total
+            "percentageValueMeatPoultryEgalimHt": 0.5,
+            "percentageValueFishEgalimHt": 0.8,
+        }
+        self.assertEqual({key: serialized_diag[key] for key in expected_percentages}, expected_percentages)
         # ensure the raw values are not included in the diagnostic
-        self.assertNotIn("valueTotalHt", serialized_diag)
-        self.assertNotIn("valueBioHt", serialized_diag)
-        self.assertNotIn("valueMeatPoultryHt", serialized_diag)
-        self.assertNotIn("valueMeatPoultryEgalimHt", serialized_diag)
-        self.assertNotIn("valueFishHt", serialized_diag)
-        self.assertNotIn("valueFishEgalimHt", serialized_diag)
+        raw_values = {
+            "valueTotalHt",
+            "valueBioHt",
+            "valueMeatPoultryHt",
+            "valueMeatPoultryEgalimHt",
+            "valueFishHt",
+            "valueFishEgalimHt",
+        }
+        self.assertFalse(serialized_diag.keys() & raw_values)
 
     def test_remove_raw_values_when_missing_totals(self):
         """
@@ -304,11 +314,11 @@ class TestPublishedCanteenApi(APITestCase):
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": canteen.id}))
         body = response.json()
 
-        serialized_diag = body.get("approDiagnostics")[0]
+        serialized_diag = body["approDiagnostics"][0]
 
-        self.assertNotIn("valueMeatPoultryEgalimHt", serialized_diag)
-        self.assertNotIn("valueMeatPoultryFranceHt", serialized_diag)
-        self.assertNotIn("valueFishEgalimHt", serialized_diag)
+        self.assertFalse(
+            serialized_diag.keys() & {"valueMeatPoultryEgalimHt", "valueMeatPoultryFranceHt", "valueFishEgalimHt"}
+        )
 
     def test_return_published_diagnostics(self):
         """
@@ -329,10 +339,10 @@ class TestPublishedCanteenApi(APITestCase):
         body = response.json()
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        self.assertEqual(len(body.get("serviceDiagnostics")), 3)
-        self.assertEqual(len(body.get("approDiagnostics")), 1)
-        serialized_diags = body.get("serviceDiagnostics")
-        serialized_appro_diags = body.get("approDiagnostics")
+        self.assertEqual(len(body["serviceDiagnostics"]), 3)
+        self.assertEqual(len(body["approDiagnostics"]), 1)
+        serialized_diags = body["serviceDiagnostics"]
+        serialized_appro_diags = body["approDiagnostics"]
 
         for diag in serialized_diags:
             self.assertNotIn("percentageValueTotalHt", diag)
@@ -369,26 +379,34 @@ class TestPublishedCanteenApi(APITestCase):
             redacted_appro_years=[],
         )
 
-        DiagnosticFactory.create(
-            canteen=central, year=2022, central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.ALL
-        )
-        DiagnosticFactory.create(
-            canteen=central, year=2023, central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO
+        Diagnostic.objects.bulk_create(
+            [
+                DiagnosticFactory.build(
+                    canteen=central,
+                    year=2022,
+                    central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.ALL,
+                ),
+                DiagnosticFactory.build(
+                    canteen=central,
+                    year=2023,
+                    central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
+                ),
+            ]
         )
         self.assertEqual(fully_redacted_satellite.central_kitchen_diagnostics.count(), 2)
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": fully_redacted_satellite.id}))
         body = response.json()
-        self.assertEqual(len(body.get("approDiagnostics")), 0)
+        self.assertEqual(len(body["approDiagnostics"]), 0)
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": partially_redacted_satellite.id}))
         body = response.json()
-        self.assertEqual(len(body.get("approDiagnostics")), 1)
-        self.assertEqual(body.get("approDiagnostics")[0]["year"], 2023)
+        self.assertEqual(len(body["approDiagnostics"]), 1)
+        self.assertEqual(body["approDiagnostics"][0]["year"], 2023)
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": other_satellite.id}))
         body = response.json()
-        self.assertEqual(len(body.get("approDiagnostics")), 2)
+        self.assertEqual(len(body["approDiagnostics"]), 2)
 
     def test_cc_can_redact_appro_data(self):
         """
@@ -413,11 +431,11 @@ class TestPublishedCanteenApi(APITestCase):
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": central.id}))
         body = response.json()
-        self.assertEqual(len(body.get("approDiagnostics")), 0)
+        self.assertEqual(len(body["approDiagnostics"]), 0)
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": satellite.id}))
         body = response.json()
-        self.assertEqual(len(body.get("approDiagnostics")), 1)
+        self.assertEqual(len(body["approDiagnostics"]), 1)
 
     def test_satellites_get_correct_appro_diagnostic(self):
         """
@@ -431,18 +449,26 @@ class TestPublishedCanteenApi(APITestCase):
             publication_status="published",
         )
 
-        DiagnosticFactory.create(canteen=satellite, year=2021)
-        DiagnosticFactory.create(
-            canteen=central, year=2022, central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO
+        Diagnostic.objects.bulk_create(
+            [
+                DiagnosticFactory.build(canteen=satellite, year=2021),
+                DiagnosticFactory.build(
+                    canteen=central,
+                    year=2022,
+                    central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
+                ),
+                DiagnosticFactory.build(
+                    canteen=central,
+                    year=2023,
+                    central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
+                ),
+                DiagnosticFactory.build(canteen=satellite, year=2023),
+            ]
         )
-        DiagnosticFactory.create(
-            canteen=central, year=2023, central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO
-        )
-        DiagnosticFactory.create(canteen=satellite, year=2023)
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": satellite.id}))
         body = response.json()
-        serialized_diagnostics = body.get("approDiagnostics")
+        serialized_diagnostics = body["approDiagnostics"]
         self.assertEqual(len(serialized_diagnostics), 3)
         for diagnostic in serialized_diagnostics:
             if diagnostic["year"] == 2021:
@@ -469,14 +495,20 @@ class TestPublishedCanteenApi(APITestCase):
             redacted_appro_years=[2023],
         )
 
-        DiagnosticFactory.create(
-            canteen=central, year=2023, central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO
+        Diagnostic.objects.bulk_create(
+            [
+                DiagnosticFactory.build(
+                    canteen=central,
+                    year=2023,
+                    central_kitchen_diagnostic_mode=Diagnostic.CentralKitchenDiagnosticMode.APPRO,
+                ),
+                DiagnosticFactory.build(canteen=satellite, year=2023),
+            ]
         )
-        DiagnosticFactory.create(canteen=satellite, year=2023)
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": satellite.id}))
         body = response.json()
-        self.assertEqual(len(body.get("approDiagnostics")), 0)
+        self.assertEqual(len(body["approDiagnostics"]), 0)
 
     def test_td_diags_not_redacted(self):
         """
@@ -492,8 +524,8 @@ class TestPublishedCanteenApi(APITestCase):
 
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": canteen.id}))
         body = response.json()
-        self.assertEqual(len(body.get("approDiagnostics")), 1)
-        self.assertEqual(len(body.get("serviceDiagnostics")), 2)
+        self.assertEqual(len(body["approDiagnostics"]), 1)
+        self.assertEqual(len(body["serviceDiagnostics"]), 2)
 
 
 @override_settings(PUBLISH_BY_DEFAULT=True)
@@ -509,7 +541,7 @@ class TestPublicCanteenApi(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         body = response.json()
-        self.assertEqual(body.get("id"), published_canteen.id)
+        self.assertEqual(body["id"], published_canteen.id)
 
     def test_get_single_army_canteen(self):
         """
@@ -530,13 +562,13 @@ class TestPublishedCanteenClaimApi(APITestCase):
         # The factory creates canteens with managers
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": canteen.id}))
         body = response.json()
-        self.assertFalse(body.get("canBeClaimed"))
+        self.assertFalse(body["canBeClaimed"])
 
         # Now we will remove the manager to change the claim API value
         canteen.managers.clear()
         response = self.client.get(reverse("single_published_canteen", kwargs={"pk": canteen.id}))
         body = response.json()
-        self.assertTrue(body.get("canBeClaimed"))
+        self.assertTrue(body["canBeClaimed"])
 
     @authenticate
     def test_canteen_claim_request(self):
@@ -549,22 +581,22 @@ class TestPublishedCanteenClaimApi(APITestCase):
         self.assertEqual(body["id"], canteen.id)
         self.assertEqual(body["name"], canteen.name)
         user = authenticate.user
-        self.assertEqual(canteen.managers.first().id, user.id)
-        self.assertEqual(canteen.managers.count(), 1)
+        self.assertEqual(set(canteen.managers.values_list("id", flat=True)), {user.id})
         canteen.refresh_from_db()
-        self.assertEqual(canteen.claimed_by, user)
+        self.assertEqual(canteen.claimed_by_id, user.id)
         self.assertTrue(canteen.has_been_claimed)
 
     @authenticate
     def test_canteen_claim_request_fails_when_already_claimed(self):
         canteen = CanteenFactory.create(publication_status=Canteen.PublicationStatus.PUBLISHED.value)
-        self.assertGreater(canteen.managers.count(), 0)
+        manager_ids = set(canteen.managers.values_list("id", flat=True))
+        self.assertTrue(manager_ids)
         user = authenticate.user
-        self.assertFalse(canteen.managers.filter(id=user.id).exists())
+        self.assertNotIn(user.id, manager_ids)
 
         response = self.client.post(reverse("claim_canteen", kwargs={"canteen_pk": canteen.id}), None)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertFalse(canteen.managers.filter(id=user.id).exists())
+        self.assertEqual(set(canteen.managers.values_list("id", flat=True)), manager_ids)
         canteen.refresh_from_db()
         self.assertFalse(canteen.has_been_claimed)
 
@@ -591,4 +623,4 @@ class TestPublishedCanteenClaimApi(APITestCase):
         self.assertTrue(canteen.managers.filter(id=authenticate.user.id).exists())
         canteen.refresh_from_db()
         self.assertTrue(canteen.has_been_claimed)
-        self.assertEqual(canteen.claimed_by, other_user)
+        self.assertEqual(canteen.claimed_by_id, other_user.id)
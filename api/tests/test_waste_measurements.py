@@ -466,9 +466,10 @@ class TestWasteMeasurementsApi(APITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
-        self.assertEqual(response.json()["periodStartDate"][0], "Ce champ ne peut être nul.")
+        body = response.json()
+        self.assertEqual(body["periodStartDate"][0], "Ce champ ne peut être nul.")
         self.assertEqual(
-            response.json()["periodEndDate"][0],
+            body["periodEndDate"][0],
             "La date n'a pas le bon format. Utilisez un des formats suivants\xa0: YYYY-MM-DD.",
         )
 
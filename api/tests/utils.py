@@ -4,18 +4,28 @@ from datetime import timedelta
 from django.utils import timezone
 
 from data.factories import UserFactory
+from data.models import Canteen
 
 
 def authenticate(func):
     @functools.wraps(func)
     def authenticate_and_func(*args, **kwargs):
         authenticate.user = UserFactory.create()
-        args[0].client.force_login(user=authenticate.user)
+        args[0].client.force_authenticate(user=authenticate.user)
         return func(*args, **kwargs)
 
     return authenticate_and_func
 
 
+def add_manager(user, *canteens):
+    """
+    Make the user a manager of all the given canteens with a single insert on the through table
+    """
+    Canteen.managers.through.objects.bulk_create(
+        [Canteen.managers.through(canteen=canteen, user=user) for canteen in canteens]
+    )
+
+
 def get_oauth2_token(scope):
     today = timezone.now()
     expiration = today + timedelta(hours=1)
@@ -107,11 +107,14 @@ class PublishedCanteensPagination(LimitOffsetPagination):
     production_types = []
 
     def paginate_queryset(self, queryset, request, view=None):
-        # Performance improvements possible
-        self.departments = set(filter(lambda x: x, queryset.values_list("department", flat=True)))
-        self.regions = set(filter(lambda x: x, queryset.values_list("region", flat=True)))
-        self.management_types = set(filter(lambda x: x, queryset.values_list("management_type", flat=True)))
-        self.production_types = set(filter(lambda x: x, queryset.values_list("production_type", flat=True)))
+        # A single query gives us the filter options as well as the count used by the pagination
+        rows = list(queryset.values_list("id", "department", "region", "management_type", "production_type"))
+        self.filtered_count = len(rows)
+        _, departments, regions, management_types, production_types = zip(*rows) if rows else ([],) * 5
+        self.departments = set(filter(lambda x: x, departments))
+        self.regions = set(filter(lambda x: x, regions))
+        self.management_types = set(filter(lambda x: x, management_types))
+        self.production_types = set(filter(lambda x: x, production_types))
 
         # Prepare sector filter options:
         # we want to return all sectors that are available after the other filters,
@@ -140,6 +143,9 @@ class PublishedCanteensPagination(LimitOffsetPagination):
 
         return super().paginate_queryset(queryset, request, view)
 
+    def get_count(self, queryset):
+        return self.filtered_count
+
     def get_paginated_response(self, data):
         return Response(
             OrderedDict(
@@ -234,27 +240,10 @@ def filter_by_diagnostic_params(queryset, query_params):
     if bio or combined or appro_badge_requested:
         publication_year = date.today().year - 1
         qs_diag = Diagnostic.objects.filter(year=publication_year, value_total_ht__gt=0)
-        if bio or appro_badge_requested:
-            qs_diag = qs_diag.annotate(
-                bio_share=Cast(Sum("value_bio_ht", default=0) / Sum("value_total_ht"), FloatField())
-            )
-            if bio:
-                qs_diag = qs_diag.filter(bio_share__gte=bio)
-        if combined or appro_badge_requested:
-            qs_diag = qs_diag.annotate(
-                combined_share=Cast(
-                    (
-                        Sum("value_bio_ht", default=0)
-                        + Sum("value_sustainable_ht", default=0)
-                        + Sum("value_externality_performance_ht", default=0)
-                        + Sum("value_egalim_others_ht", default=0)
-                    )
-                    / Sum("value_total_ht"),
-                    FloatField(),
-                )
-            )
-            if combined:
-                qs_diag = qs_diag.filter(combined_share__gte=combined)
+        if bio:
+            qs_diag = qs_diag.filter(bio_share__gte=bio)
+        if combined:
+            qs_diag = qs_diag.filter(combined_share__gte=combined)
         if appro_badge_requested:
             group_1 = [Region.guadeloupe, Region.martinique, Region.guyane, Region.la_reunion]
             group_2 = [Region.mayotte]
@@ -268,7 +257,7 @@ def filter_by_diagnostic_params(queryset, query_params):
                     combined_share__gte=0.3,
                     bio_share__gte=0.1,
                 )
-            ).distinct()
+            )
         canteen_ids = qs_diag.values_list("canteen", flat=True)
         canteen_sirets = qs_diag.values_list("canteen__siret", flat=True)
         queryset = queryset.exclude(redacted_appro_years__contains=[publication_year])
@@ -291,7 +280,24 @@ class PublishedCanteensView(ListAPIView):
     filterset_class = PublishedCanteenFilterSet
 
     def get_queryset(self):
-        return Canteen.objects.publicly_visible()
+        # the preview serializer doesn't use the free text columns, no need to fetch them for every row
+        return (
+            Canteen.objects.publicly_visible()
+            .defer(
+                "import_source",
+                "logo",
+                "publication_comments",
+                "quality_comments",
+                "waste_comments",
+                "diversification_comments",
+                "plastics_comments",
+                "information_comments",
+                "creation_mtm_source",
+                "creation_mtm_campaign",
+                "creation_mtm_medium",
+            )
+            .prefetch_related("sectors", "images")
+        )
 
     def filter_queryset(self, queryset):
         new_queryset = filter_by_diagnostic_params(queryset, self.request.query_params)
@@ -786,24 +792,6 @@ def badges_for_queryset(diagnostic_year_queryset):
     appro_total = diagnostic_year_queryset.count()
     if appro_total:
         appro_share_query = diagnostic_year_queryset.filter(value_total_ht__gt=0)
-        appro_share_query = appro_share_query.annotate(
-            bio_share=Cast(
-                Sum("value_bio_ht", default=0) / Sum("value_total_ht"),
-                FloatField(),
-            )
-        )
-        appro_share_query = appro_share_query.annotate(
-            combined_share=Cast(
-                (
-                    Sum("value_bio_ht", default=0)
-                    + Sum("value_sustainable_ht", default=0)
-                    + Sum("value_externality_performance_ht", default=0)
-                    + Sum("value_egalim_others_ht", default=0)
-                )
-                / Sum("value_total_ht"),
-                FloatField(),
-            )
-        )
         # Saint-Martin should be in group 1
         group_1 = [Region.guadeloupe, Region.martinique, Region.guyane, Region.la_reunion]
         group_2 = [Region.mayotte]
@@ -885,9 +873,6 @@ class CanteenStatisticsView(APIView):
         )
 
         appro_share_query = diagnostics.filter(value_total_ht__gt=0)
-        appro_share_query = appro_share_query.annotate(
-            bio_share=Cast(Sum("value_bio_ht", default=0) / Sum("value_total_ht"), FloatField())
-        )
         appro_share_query = appro_share_query.annotate(
             sustainable_share=Cast(
                 (
@@ -70,6 +70,11 @@ class MaCantineOrderingFilter(filters.OrderingFilter):
 
 
 class UnaccentSearchFilter(filters.SearchFilter):
+    """
+    Accent insensitive search. Relies on the IMMUTABLE f_unaccent function so that
+    trigram indexes on UPPER(f_unaccent(field)) can be used.
+    """
+
     def construct_search(self, field_name, queryset):
         lookup = self.lookup_prefixes.get(field_name[0])
         if lookup:
@@ -79,7 +84,7 @@ class UnaccentSearchFilter(filters.SearchFilter):
         return LOOKUP_SEP.join(
             [
                 field_name,
-                "unaccent",
+                "f_unaccent",
                 lookup,
             ]
         )
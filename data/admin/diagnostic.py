@@ -45,6 +45,7 @@ class DiagnosticAdmin(SimpleHistoryAdmin):
         "creation_date",
         "modification_date",
     )
+    list_select_related = ("canteen",)
     list_filter = ("year",)
     readonly_fields = (
         "creation_mtm_source",
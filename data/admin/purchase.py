@@ -43,6 +43,7 @@ class PurchaseAdmin(SoftDeletionAdmin):
         "canteen",
         "price_ht",
     )
+    list_select_related = ("canteen",)
     list_filter = (
         "family",
         get_arrayfield_list_filter("characteristics", "Caractéristique"),
@@ -115,6 +115,7 @@ class ReservationExpeAdmin(admin.ModelAdmin):
         "creation_date",
         "has_reservation_system",
     )
+    list_select_related = ("canteen",)
 
     list_filter = (ReservationExpeParticipantFilter,)
 
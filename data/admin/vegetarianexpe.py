@@ -145,6 +145,7 @@ class VegetarianExpeAdmin(admin.ModelAdmin):
         "creation_date",
         "has_daily_vegetarian_offer",
     )
+    list_select_related = ("canteen",)
 
     list_filter = (VegetarianExpeParticipantFilter,)
 
@@ -17,16 +17,44 @@ class CanteenFactory(factory.django.DjangoModelFactory):
     city_insee_code = factory.Faker("postcode")
     daily_meal_count = factory.Faker("pyint")
 
+    @classmethod
+    def create_bare_batch(cls, attributes_list):
+        """
+        Creates canteens from a list of attribute dicts with a single INSERT, for tests that
+        don't need the related objects: no managers nor sectors are created.
+        Canteen.save is bypassed, the region is still derived from the department.
+        """
+        canteens = [cls.build(**attributes) for attributes in attributes_list]
+        for canteen in canteens:
+            if canteen.department:
+                canteen.region = canteen._get_region()
+        return Canteen.objects.bulk_create(canteens)
+
+    @classmethod
+    def create_batch_with_sectors(cls, specs):
+        """
+        Creates bare canteens from a list of (attributes, sectors) pairs with a single INSERT
+        for the canteens and another one for their sectors.
+        """
+        canteens = cls.create_bare_batch([attributes for attributes, _ in specs])
+        CanteenSector = Canteen.sectors.through
+        CanteenSector.objects.bulk_create(
+            [
+                CanteenSector(canteen=canteen, sector=sector)
+                for canteen, (_, sectors) in zip(canteens, specs)
+                for sector in sectors
+            ]
+        )
+        return canteens
+
     @factory.post_generation
     def sectors(self, create, extracted, **kwargs):
         if not create or extracted == []:
             return
         if extracted:
-            for sector in extracted:
-                self.sectors.add(sector)
+            self.sectors.add(*extracted)
         else:
-            for _ in range(random.randint(1, 4)):
-                self.sectors.add(SectorFactory.create())
+            self.sectors.add(*SectorFactory.create_batch(random.randint(1, 4)))
 
     @factory.post_generation
     def managers(self, create, extracted, **kwargs):
@@ -6,5 +6,6 @@ from data.models import Sector
 class SectorFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Sector
+        django_get_or_create = ("name",)
 
     name = factory.Faker("text", max_nb_chars=20)
@@ -9,6 +9,7 @@ class UserFactory(factory.django.DjangoModelFactory):
     first_name = factory.Faker("first_name")
     last_name = factory.Faker("last_name")
     username = factory.Sequence(lambda n: "user_%d" % n)
-    email = factory.Faker("email")
+    # Faker emails can repeat, the username makes them unique
+    email = factory.LazyAttribute(lambda user: f"{user.username}@example.com")
     is_dev = False
     is_elected_official = False
@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.postgres.fields import ArrayField
+from django.db.models import CharField, TextField, Transform
 
 
 class ChoiceArrayField(ArrayField):
@@ -19,3 +20,18 @@ class ChoiceArrayField(ArrayField):
         # care for it.
         # pylint:disable=bad-super-call
         return super(ArrayField, self).formfield(**defaults)
+
+
+class ImmutableUnaccent(Transform):
+    """
+    Same as django.contrib.postgres' unaccent lookup, but calls the IMMUTABLE
+    f_unaccent wrapper (see migration 0156) so that the expression can be indexed.
+    """
+
+    bilateral = True
+    lookup_name = "f_unaccent"
+    function = "F_UNACCENT"
+
+
+CharField.register_lookup(ImmutableUnaccent)
+TextField.register_lookup(ImmutableUnaccent)
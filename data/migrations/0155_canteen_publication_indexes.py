@@ -0,0 +1,35 @@
+# Generated by Django 5.0.8 on 2024-09-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0154_merge_20240916_1041"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="canteen",
+            index=models.Index(
+                fields=["publication_status", "-creation_date"],
+                name="data_cantee_publica_c87014_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="canteen",
+            index=models.Index(
+                fields=["publication_status", "-modification_date"],
+                name="data_cantee_publica_8f78a9_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="canteen",
+            index=models.Index(
+                models.F("publication_status"),
+                models.OrderBy(models.F("daily_meal_count"), nulls_first=True),
+                name="data_canteen_pub_meal_idx",
+            ),
+        ),
+    ]
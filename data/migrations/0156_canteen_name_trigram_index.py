@@ -0,0 +1,38 @@
+# Generated by Django 5.0.8 on 2024-09-17 14:03
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+import data.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0155_canteen_publication_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # unaccent() is only STABLE, so it cannot be used in an index expression
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS
+            $func$ SELECT public.unaccent('public.unaccent', $1) $func$;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS f_unaccent(text);",
+        ),
+        migrations.AddIndex(
+            model_name="canteen",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(data.fields.ImmutableUnaccent("name")),
+                    name="gin_trgm_ops",
+                ),
+                name="data_canteen_name_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.0.8 on 2024-09-18 09:27
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0156_canteen_name_trigram_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="diagnostic",
+            name="bio_share",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.comparison.Cast(
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.functions.comparison.Coalesce(
+                            "value_bio_ht",
+                            models.Value(0),
+                            output_field=models.DecimalField(),
+                        ),
+                        "/",
+                        django.db.models.functions.comparison.NullIf(
+                            "value_total_ht", models.Value(0)
+                        ),
+                    ),
+                    models.FloatField(),
+                ),
+                output_field=models.FloatField(),
+                verbose_name="Part bio",
+            ),
+        ),
+        migrations.AddField(
+            model_name="diagnostic",
+            name="combined_share",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.comparison.Cast(
+                    django.db.models.expressions.CombinedExpression(
+                        django.db.models.expressions.CombinedExpression(
+                            django.db.models.expressions.CombinedExpression(
+                                django.db.models.expressions.CombinedExpression(
+                                    django.db.models.functions.comparison.Coalesce(
+                                        "value_bio_ht",
+                                        models.Value(0),
+                                        output_field=models.DecimalField(),
+                                    ),
+                                    "+",
+                                    django.db.models.functions.comparison.Coalesce(
+                                        "value_sustainable_ht",
+                                        models.Value(0),
+                                        output_field=models.DecimalField(),
+                                    ),
+                                ),
+                                "+",
+                                django.db.models.functions.comparison.Coalesce(
+                                    "value_externality_performance_ht",
+                                    models.Value(0),
+                                    output_field=models.DecimalField(),
+                                ),
+                            ),
+                            "+",
+                            django.db.models.functions.comparison.Coalesce(
+                                "value_egalim_others_ht",
+                                models.Value(0),
+                                output_field=models.DecimalField(),
+                            ),
+                        ),
+                        "/",
+                        django.db.models.functions.comparison.NullIf(
+                            "value_total_ht", models.Value(0)
+                        ),
+                    ),
+                    models.FloatField(),
+                ),
+                output_field=models.FloatField(),
+                verbose_name="Part EGAlim (bio inclus)",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="diagnostic",
+            index=models.Index(
+                fields=["year", "bio_share"], name="data_diagno_year_3608c4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="diagnostic",
+            index=models.Index(
+                fields=["year", "combined_share"], name="data_diagno_year_adea8e_idx"
+            ),
+        ),
+    ]
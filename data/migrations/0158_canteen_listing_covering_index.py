@@ -0,0 +1,32 @@
+# Generated by Django 5.0.8 on 2024-09-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0157_diagnostic_appro_shares"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="canteen",
+            name="data_cantee_publica_c87014_idx",
+        ),
+        migrations.AddIndex(
+            model_name="canteen",
+            index=models.Index(
+                fields=["publication_status", "-creation_date"],
+                include=(
+                    "deletion_date",
+                    "id",
+                    "department",
+                    "region",
+                    "management_type",
+                    "production_type",
+                ),
+                name="data_canteen_pub_list_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.8 on 2024-09-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0158_canteen_listing_covering_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="teledeclaration",
+            index=models.Index(
+                fields=["year", "status", "creation_date"],
+                name="data_telede_year_531f1a_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.8 on 2024-09-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0159_teledeclaration_etl_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="canteen",
+            index=models.Index(
+                condition=models.Q(("deletion_date__isnull", False)),
+                fields=["deletion_date"],
+                name="data_canteen_deleted_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchase",
+            index=models.Index(
+                condition=models.Q(("deletion_date__isnull", False)),
+                fields=["deletion_date"],
+                name="data_purchase_deleted_idx",
+            ),
+        ),
+    ]
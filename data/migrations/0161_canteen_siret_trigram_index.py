@@ -0,0 +1,27 @@
+# Generated by Django 5.0.8 on 2024-09-18 11:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+import data.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0160_soft_deleted_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="canteen",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper(data.fields.ImmutableUnaccent("siret")),
+                    name="gin_trgm_ops",
+                ),
+                name="data_canteen_siret_trgm_idx",
+            ),
+        ),
+    ]
@@ -2,14 +2,16 @@ from urllib.parse import quote
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.utils.functional import cached_property
 from simple_history.models import HistoricalRecords
 
 from data.department_choices import Department
-from data.fields import ChoiceArrayField
+from data.fields import ChoiceArrayField, ImmutableUnaccent
 from data.region_choices import Region
 from data.utils import (
     get_diagnostic_lower_limit_year,
@@ -91,6 +93,35 @@ class Canteen(SoftDeletionModel):
         indexes = [
             models.Index(fields=["siret"]),
             models.Index(fields=["central_producer_siret"]),
+            # published canteens listing: filter on publication status, then sort
+            # covers the default listing order and the filter options query of PublishedCanteensPagination
+            models.Index(
+                fields=["publication_status", "-creation_date"],
+                include=["deletion_date", "id", "department", "region", "management_type", "production_type"],
+                name="data_canteen_pub_list_idx",
+            ),
+            models.Index(fields=["publication_status", "-modification_date"]),
+            models.Index(
+                "publication_status",
+                models.F("daily_meal_count").asc(nulls_first=True),
+                name="data_canteen_pub_meal_idx",
+            ),
+            # accent and case insensitive search on the name and siret, see UnaccentSearchFilter
+            # both are needed: the search ORs the two fields, so a BitmapOr needs an index on each
+            GinIndex(
+                OpClass(Upper(ImmutableUnaccent("name")), name="gin_trgm_ops"),
+                name="data_canteen_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper(ImmutableUnaccent("siret")), name="gin_trgm_ops"),
+                name="data_canteen_siret_trgm_idx",
+            ),
+            # admin "Supprimée" filter, see SoftDeletionStatusFilter
+            models.Index(
+                fields=["deletion_date"],
+                condition=models.Q(deletion_date__isnull=False),
+                name="data_canteen_deleted_idx",
+            ),
         ]
 
     class ManagementType(models.TextChoices):
@@ -473,7 +504,8 @@ class Canteen(SoftDeletionModel):
 
     @property
     def lead_image(self):
-        return self.images.first()
+        # all() rather than first() so that prefetch_related("images") is used in listings
+        return min(self.images.all(), key=lambda image: image.id, default=None)
 
 
 class CanteenImage(models.Model):
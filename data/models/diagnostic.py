@@ -3,6 +3,8 @@ from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Cast, Coalesce, NullIf
 from simple_history.models import HistoricalRecords
 
 from data.department_choices import Department
@@ -20,6 +22,10 @@ class Diagnostic(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["canteen", "year"], name="annual_diagnostic"),
         ]
+        indexes = [
+            models.Index(fields=["year", "bio_share"]),
+            models.Index(fields=["year", "combined_share"]),
+        ]
 
     # NB: if the label of the choice changes, double check that the teledeclaration PDF
     # doesn't need an update as well, since the logic in the templates is based on the label
@@ -113,7 +119,7 @@ class Diagnostic(models.Model):
 
     creation_date = models.DateTimeField(auto_now_add=True)
     modification_date = models.DateTimeField(auto_now=True)
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=["bio_share", "combined_share"])
     diagnostic_type = models.CharField(
         max_length=255,
         choices=DiagnosticType.choices,
@@ -289,6 +295,33 @@ class Diagnostic(models.Model):
         verbose_name="Valeur label HVE",
     )
 
+    # Shares of the total used by the public canteen filters, computed by the database
+    bio_share = models.GeneratedField(
+        expression=Cast(
+            Coalesce("value_bio_ht", Value(0), output_field=models.DecimalField())
+            / NullIf("value_total_ht", Value(0)),
+            models.FloatField(),
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+        verbose_name="Part bio",
+    )
+    combined_share = models.GeneratedField(
+        expression=Cast(
+            (
+                Coalesce("value_bio_ht", Value(0), output_field=models.DecimalField())
+                + Coalesce("value_sustainable_ht", Value(0), output_field=models.DecimalField())
+                + Coalesce("value_externality_performance_ht", Value(0), output_field=models.DecimalField())
+                + Coalesce("value_egalim_others_ht", Value(0), output_field=models.DecimalField())
+            )
+            / NullIf("value_total_ht", Value(0)),
+            models.FloatField(),
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+        verbose_name="Part EGAlim (bio inclus)",
+    )
+
     # Food waste
     has_waste_diagnostic = models.BooleanField(
         blank=True, null=True, verbose_name="diagnostic sur le gaspillage réalisé"
@@ -13,7 +13,15 @@ class Purchase(SoftDeletionModel):
         verbose_name = "achat"
         verbose_name_plural = "achats"
         ordering = ["-date", "-creation_date"]
-        indexes = [models.Index(fields=["import_source"])]
+        indexes = [
+            models.Index(fields=["import_source"]),
+            # admin "Supprimée" filter, see SoftDeletionStatusFilter
+            models.Index(
+                fields=["deletion_date"],
+                condition=models.Q(deletion_date__isnull=False),
+                name="data_purchase_deleted_idx",
+            ),
+        ]
 
     class Category(models.TextChoices):
         VIANDES_VOLAILLES = "VIANDES_VOLAILLES", "Viandes, volailles"
@@ -101,25 +109,24 @@ class Purchase(SoftDeletionModel):
     )
     import_source = models.TextField(null=True, blank=True, verbose_name="source de l'import du produit")
 
+    _family_labels = dict(Family.choices)
+    _characteristic_labels = dict(Characteristic.choices)
+
     @property
     def readable_family(self):
         if not self.family:
             return None
-        try:
-            return Purchase.Family(self.family).label
-        except Exception:
-            return None
+        return Purchase._family_labels.get(self.family)
 
     @property
     def readable_characteristics(self):
         if not self.characteristics:
             return None
-        valid_characteristics = []
-        for characteristic in self.characteristics:
-            try:
-                valid_characteristics.append(Purchase.Characteristic(characteristic).label)
-            except Exception:
-                pass
+        valid_characteristics = [
+            Purchase._characteristic_labels[characteristic]
+            for characteristic in self.characteristics
+            if characteristic in Purchase._characteristic_labels
+        ]
         return ", ".join(valid_characteristics) if valid_characteristics else None
 
     @property
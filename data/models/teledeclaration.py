@@ -36,7 +36,7 @@ class Teledeclaration(models.Model):
                 fields=["year", "canteen"], condition=models.Q(status="SUBMITTED"), name="unique_submitted_td"
             )
         ]
-        indexes = [models.Index(fields=["canteen", "year"])]
+        indexes = [models.Index(fields=["canteen", "year"]), models.Index(fields=["year", "status", "creation_date"])]
 
     class TeledeclarationMode(models.TextChoices):
         SATELLITE_WITHOUT_APPRO = (
@@ -1,4 +1,3 @@
-import json
 import logging
 import re
 
@@ -199,7 +198,7 @@ class ETL_ANALYSIS(etl.ETL):
         self.years = utils.CAMPAIGN_DATES.keys()
         self.extracted_table_name = "teledeclarations_extracted"
         self.warehouse = DataWareHouse()
-        self.schema = json.load(open("data/schemas/schema_analysis.json"))
+        self.schema = utils.load_schema("schema_analysis")
 
     def extract_dataset(self):
         # Load teledeclarations from prod database into the Data Warehouse
@@ -208,7 +207,7 @@ class ETL_ANALYSIS(etl.ETL):
 
     def transform_dataset(self):
         # Flatten json 'declared_data' column
-        df_json = pd.json_normalize(self.df["declared_data"])
+        df_json = pd.json_normalize(self.df["declared_data"].tolist())
         del df_json["year"]
         del df_json["canteen.id"]
         df_json.index = self.df.id
@@ -233,9 +232,9 @@ class ETL_ANALYSIS(etl.ETL):
         # Fill campaign participation
         logger.info("Canteens : Fill campaign participations...")
         for year in utils.CAMPAIGN_DATES.keys():
-            campaign_participation = utils.map_canteens_td(year)
+            campaign_participation = set(utils.map_canteens_td(year))
             col_name_campaign = f"declaration_{year}"
-            self.df[col_name_campaign] = self.df["id"].apply(lambda x: x in campaign_participation)
+            self.df[col_name_campaign] = self.df["id"].isin(campaign_participation)
 
         # Extract the sector names and categories
         logger.info("Canteens : Extract sectors...")
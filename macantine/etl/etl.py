@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 
 from data.department_choices import Department
 from data.region_choices import Region
-from macantine.etl.utils import format_geo_name
+from macantine.etl.utils import format_geo_names
 
 logger = logging.getLogger(__name__)
 
@@ -19,10 +19,10 @@ class ETL(ABC):
         Returns:
             pd.DataFrame: The dataset with two new columns : department_lib and region_lib
         """
-        geo_data = {"department": {i.value: i.label for i in Department}, "region": {i.value: i.label for i in Region}}
+        geo_data = {"department": format_geo_names(Department), "region": format_geo_names(Region)}
         for geo_zoom in ["department", "region"]:
             col_geo_zoom = f"{prefix}{geo_zoom}"
-            col_to_insert = self.df[col_geo_zoom].apply(lambda x: format_geo_name(x, geo_data[geo_zoom]))
+            col_to_insert = self.df[col_geo_zoom].map(geo_data[geo_zoom])
             if f"{col_geo_zoom}_lib" in self.df.columns:
                 del self.df[f"{col_geo_zoom}_lib"]
             self.df.insert(self.df.columns.get_loc(col_geo_zoom) + 1, f"{col_geo_zoom}_lib", col_to_insert)
@@ -1,5 +1,4 @@
 import csv
-import json
 import os
 import time
 from io import BytesIO
@@ -30,21 +29,19 @@ class ETL_OPEN_DATA(etl.ETL):
 
         if "campagne_td" in self.dataset_name:
             # Get department and region as most of TD doesnt have this info
-            self.df["canteen_department"] = self.df["canteen_city_insee_code"].apply(
-                lambda x: macantine.etl.utils.fetch_commune_detail(x, communes_infos, "department")
+            self.df["canteen_department"] = self.df["canteen_city_insee_code"].map(
+                macantine.etl.utils.map_communes_detail(communes_infos, "department")
             )
-            self.df["canteen_region"] = self.df["canteen_city_insee_code"].apply(
-                lambda x: macantine.etl.utils.fetch_commune_detail(x, communes_infos, "region")
+            self.df["canteen_region"] = self.df["canteen_city_insee_code"].map(
+                macantine.etl.utils.map_communes_detail(communes_infos, "region")
             )
 
-        self.df[prefix + "epci"] = self.df[prefix + "city_insee_code"].apply(
-            lambda x: macantine.etl.utils.fetch_commune_detail(x, communes_infos, "epci")
+        self.df[prefix + "epci"] = self.df[prefix + "city_insee_code"].map(
+            macantine.etl.utils.map_communes_detail(communes_infos, "epci")
         )
 
         epcis_names = macantine.etl.utils.map_epcis_code_name()
-        self.df[prefix + "epci_lib"] = self.df[prefix + "epci"].apply(
-            lambda x: macantine.etl.utils.fetch_epci_name(x, epcis_names)
-        )
+        self.df[prefix + "epci_lib"] = self.df[prefix + "epci"].map(epcis_names)
 
         logger.info("Start filling geo_name")
         self.fill_geo_names(prefix)
@@ -69,8 +66,11 @@ class ETL_OPEN_DATA(etl.ETL):
 
     def _extract_sectors(self):
         # Fetching sectors information and aggreting in list in order to have only one row per canteen
-        sectors = macantine.etl.utils.map_sectors()
-        self.df["sectors"] = self.df["sectors"].apply(lambda x: macantine.etl.utils.fetch_sector(x, sectors))
+        sectors = {
+            sector_id: macantine.etl.utils.format_sector(sector)
+            for sector_id, sector in macantine.etl.utils.map_sectors().items()
+        }
+        self.df["sectors"] = self.df["sectors"].map(sectors).fillna("")
         canteens_sectors = self.df.groupby("id")["sectors"].apply(list).apply(macantine.etl.utils.format_list_sectors)
         del self.df["sectors"]
 
@@ -106,7 +106,7 @@ class ETL_OPEN_DATA(etl.ETL):
         res = requests.get(
             f"https://api.validata.etalab.studio/validate?schema={self.schema_url}&url={dataset_to_validate_url}&header_case=true"
         )
-        report = json.loads(res.text)["report"]
+        report = res.json()["report"]
         if len(report["errors"]) > 0 or report["stats"]["errors"] > 0:
             logger.error(f"The dataset {self.dataset_name} extraction has errors : ")
             logger.error(report["errors"])
@@ -116,9 +116,8 @@ class ETL_OPEN_DATA(etl.ETL):
             return 1
 
     def _load_data_csv(self, filename):
-        df_csv = self.df.copy()
         with default_storage.open(filename + ".csv", "w") as csv_file:
-            df_csv.to_csv(
+            self.df.to_csv(
                 csv_file,
                 sep=";",
                 index=False,
@@ -187,7 +186,7 @@ class ETL_CANTEEN(ETL_OPEN_DATA):
     def __init__(self):
         super().__init__()
         self.dataset_name = "registre_cantines"
-        self.schema = json.load(open("data/schemas/schema_cantine.json"))
+        self.schema = macantine.etl.utils.load_schema("schema_cantine")
         self.schema_url = (
             "https://raw.githubusercontent.com/betagouv/ma-cantine/staging/data/schemas/schema_cantine.json"
         )
@@ -213,11 +212,12 @@ class ETL_CANTEEN(ETL_OPEN_DATA):
         start = time.time()
         self.canteens = Canteen.objects.exclude(exclude_filter)
 
-        if self.canteens.count() == 0:
+        canteens = list(self.canteens.values(*self.canteens_col_from_db))
+        if not canteens:
             self.df = pd.DataFrame(columns=self.canteens_col_from_db)
         else:
             # Creating a dataframe with all canteens. The canteens can have multiple lines if they have multiple sectors
-            self.df = pd.DataFrame(self.canteens.values(*self.canteens_col_from_db))
+            self.df = pd.DataFrame(canteens)
 
         end = time.time()
         logger.info(f"Time spent on canteens extraction : {end - start}")
@@ -225,10 +225,10 @@ class ETL_CANTEEN(ETL_OPEN_DATA):
     def transform_dataset(self):
         # Adding the active_on_ma_cantine column
         start = time.time()
-        non_active_canteens = Canteen.objects.filter(managers=None).values_list("id", flat=True)
+        non_active_canteens = set(Canteen.objects.filter(managers=None).values_list("id", flat=True))
         end = time.time()
         logger.info(f"Time spent on active canteens : {end - start}")
-        self.df["active_on_ma_cantine"] = self.df["id"].apply(lambda x: x not in non_active_canteens)
+        self.df["active_on_ma_cantine"] = ~self.df["id"].isin(non_active_canteens)
 
         logger.info("Canteens : Extract sectors...")
         self.df = self._extract_sectors()
@@ -251,12 +251,12 @@ class ETL_CANTEEN(ETL_OPEN_DATA):
         logger.info("Canteens : Fill campaign participations...")
         start = time.time()
         for year in [2021, 2022, 2023]:
-            campaign_participation = macantine.etl.utils.map_canteens_td(year)
+            campaign_participation = set(macantine.etl.utils.map_canteens_td(year))
             if year == 2023:
                 col_name_campaign = f"declaration_donnees_{year}_en_cours"
             else:
                 col_name_campaign = f"declaration_donnees_{year}"
-            self.df[col_name_campaign] = self.df["id"].apply(lambda x: x in campaign_participation)
+            self.df[col_name_campaign] = self.df["id"].isin(campaign_participation)
         end = time.time()
         logger.info(f"Time spent on campaign participations : {end - start}")
 
@@ -266,7 +266,7 @@ class ETL_TD(ETL_OPEN_DATA):
         super().__init__()
         self.year = year
         self.dataset_name = f"campagne_td_{year}"
-        self.schema = json.load(open("data/schemas/schema_teledeclaration.json"))
+        self.schema = macantine.etl.utils.load_schema("schema_teledeclaration")
         self.schema_url = (
             "https://raw.githubusercontent.com/betagouv/ma-cantine/staging/data/schemas/schema_teledeclaration.json"
         )
@@ -334,13 +334,12 @@ class ETL_TD(ETL_OPEN_DATA):
         self.transform_geo_data(prefix="canteen_")
 
     def _flatten_declared_data(self):
-        tmp_df = pd.json_normalize(self.df["declared_data"])
+        tmp_df = pd.json_normalize(self.df["declared_data"].tolist())
         self.df = pd.concat([self.df.drop("declared_data", axis=1), tmp_df], axis=1)
         return self.df
 
-    def _aggregation_col(self, categ="bio", sub_categ=["_bio"]):
-        pattern = "|".join(sub_categ)
-        self.df[f"teledeclaration.value_{categ}_ht"] = self.df.filter(regex=pattern).sum(
+    def _aggregation_col(self, categ, columns):
+        self.df[f"teledeclaration.value_{categ}_ht"] = self.df[columns].sum(
             axis=1, numeric_only=True, skipna=True, min_count=1
         )
 
@@ -348,8 +347,13 @@ class ETL_TD(ETL_OPEN_DATA):
         """
         Aggregate the columns of a complete TD for an appro category if the total value of this category is not specified.
         """
-        for categ, elements_in_categ in self.categories_to_aggregate.items():
-            self._aggregation_col(categ, elements_in_categ)
+        # The columns of each category are listed in a single pass, before the aggregated columns are added
+        columns_by_categ = {
+            categ: [col for col in self.df.columns if any(element in col for element in elements_in_categ)]
+            for categ, elements_in_categ in self.categories_to_aggregate.items()
+        }
+        for categ, columns in columns_by_categ.items():
+            self._aggregation_col(categ, columns)
 
     def _filter_null_values(self):
         "We have decided not take into accounts the TD where the value total or the value bio are null"
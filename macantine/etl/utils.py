@@ -1,3 +1,5 @@
+import functools
+import json
 import logging
 import os
 import zoneinfo
@@ -75,6 +77,15 @@ def update_datagouv_resources():
         logger.exception(e)
 
 
+@functools.cache
+def load_schema(schema_name):
+    """
+    Load a dataset schema from data/schemas, read from disk only once per process
+    """
+    with open(f"data/schemas/{schema_name}.json") as schema_file:
+        return json.load(schema_file)
+
+
 def map_communes_infos():
     """
     Create a dict that maps cities with their EPCI code
@@ -82,7 +93,9 @@ def map_communes_infos():
     commune_details = {}
     try:
         logger.info("Starting communes dl")
-        response_commune = requests.get("https://geo.api.gouv.fr/communes", timeout=50)
+        response_commune = requests.get(
+            "https://geo.api.gouv.fr/communes?fields=code,codeDepartement,codeRegion,codeEpci", timeout=50
+        )
         response_commune.raise_for_status()
         communes = response_commune.json()
         for commune in communes:
@@ -117,7 +130,7 @@ def map_canteens_td(year):
     """
     Populate mapper for a given year. The mapper indicates if one canteen has participated in campaign
     """
-    # Check and fetch Teledeclaration data from the database
+    # Check and fetch Teledeclaration data from the database, only the satellites are needed from the declared data
     tds = Teledeclaration.objects.filter(
         year=year,
         creation_date__range=(
@@ -125,15 +138,14 @@ def map_canteens_td(year):
             CAMPAIGN_DATES[year]["end_date"],
         ),
         status=Teledeclaration.TeledeclarationStatus.SUBMITTED,
-    ).values("canteen_id", "declared_data")
+    ).values_list("canteen_id", "declared_data__satellites")
 
     # Populate the mapper for the given year
     participation = []
-    for td in tds:
-        participation.append(td["canteen_id"])
-        if "satellites" in td["declared_data"]:
-            for satellite in td["declared_data"]["satellites"]:
-                participation.append(satellite["id"])
+    for canteen_id, satellites in tds:
+        participation.append(canteen_id)
+        for satellite in satellites or []:
+            participation.append(satellite["id"])
     return participation
 
 
@@ -162,7 +174,9 @@ def fetch_teledeclarations(years: list) -> pd.DataFrame:
                     ),
                     status=Teledeclaration.TeledeclarationStatus.SUBMITTED,
                     canteen_id__isnull=False,
-                ).values()
+                )
+                .values()
+                .iterator(chunk_size=2000)  # stream the rows, declared data documents can be large
             )
             df = pd.concat([df, df_year])
         else:
@@ -172,33 +186,20 @@ def fetch_teledeclarations(years: list) -> pd.DataFrame:
     return df
 
 
-def fetch_commune_detail(code_insee_commune, commune_details, geo_detail_type):
-    """
-    Provide EPCI code/ Department code/ Region code for a city, given the insee code of the city
-    """
-    if (
-        code_insee_commune
-        and code_insee_commune in commune_details.keys()
-        and geo_detail_type in commune_details[code_insee_commune].keys()
-    ):
-        return commune_details[code_insee_commune][geo_detail_type]
-
-
-def fetch_epci_name(code_insee_epci, epcis_names):
+def map_communes_detail(commune_details, geo_detail_type):
     """
-    Provide EPCI code for an epci, given its insee code
+    Map the insee code of each city to its EPCI code/ Department code/ Region code
     """
-    if code_insee_epci and code_insee_epci in epcis_names.keys():
-        return epcis_names[code_insee_epci]
+    return {code: details[geo_detail_type] for code, details in commune_details.items() if geo_detail_type in details}
 
 
-def format_geo_name(geo_code: int, geo_names: Dict[int, str]):
+def format_geo_names(geo_choices) -> Dict[str, str]:
     """
-    Format the name of a region or department from its code
+    Map the codes of a region or department choices enum to their formatted names
     """
-    if isinstance(geo_code, str) and geo_code not in ["978", "987", "975", "988"]:
-        geo_name = geo_names[geo_code].split(" - ")[1].lstrip()
-        return geo_name
+    return {
+        i.value: i.label.split(" - ")[1].lstrip() for i in geo_choices if i.value not in ["978", "987", "975", "988"]
+    }
 
 
 def format_sector(sector: dict) -> str:
@@ -209,17 +210,6 @@ def format_list_sectors(sectors) -> str:
     return f'"[{", ".join(sectors)}]"'
 
 
-def fetch_sector(sector_id, sectors):
-    """
-    Provide EPCI code for a city, given the insee code of the city
-    """
-    if sector_id and sector_id in sectors.keys():
-        sector = sectors[sector_id]
-        return format_sector(sector)
-    else:
-        return ""
-
-
 def datetimes_to_str(df):
     date_columns = df.select_dtypes(include=["datetime64[ns, UTC]"]).columns
     for date_column in date_columns:
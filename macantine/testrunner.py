@@ -1,14 +1,64 @@
-from random import randint
+import multiprocessing
+import os
+import random
 
 import factory.random
 from django.conf import settings
-from django.test.runner import DiscoverRunner
+from django.test.runner import (
+    DiscoverRunner,
+    ParallelTestSuite,
+    _init_worker,
+    _run_subsuite,
+)
+from django.test.utils import override_settings
+
+TEST_SEED_ENV = "MACANTINE_TEST_SEED"
+
+
+def fast_password_hashers():
+    # The default hasher is slow on purpose, which only slows down tests creating users with a password
+    return override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+
+
+def init_worker_with_fast_hashers(*args, **kwargs):
+    _init_worker(*args, **kwargs)
+    # Forked workers inherit the override from the main process, spawned ones start from the settings module
+    if multiprocessing.get_start_method() == "spawn":
+        fast_password_hashers().enable()
+
+
+def reseed(seed):
+    factory.random.reseed_random(seed)
+    # some factories draw from the standard random module rather than from factory_boy's
+    random.seed(seed)
+
+
+def run_subsuite_with_seed(args):
+    # With --parallel the test classes run by a worker depend on timing, so the factory random state is reset for
+    # every test class: the printed seed then reproduces each class's data whichever worker picks it up
+    reseed(int(os.environ[TEST_SEED_ENV]))
+    return _run_subsuite(args)
+
+
+class MaCantineParallelTestSuite(ParallelTestSuite):
+    init_worker = init_worker_with_fast_hashers
+    run_subsuite = run_subsuite_with_seed
 
 
 class MaCantineTestRunner(DiscoverRunner):
+    parallel_test_suite = MaCantineParallelTestSuite
+
     def setup_test_environment(self, **kwargs):
         override_seed = settings.OVERRIDE_TEST_SEED
-        seed = int(override_seed) if override_seed else randint(0, 65535)
-        factory.random.reseed_random(seed)
+        seed = int(override_seed) if override_seed else random.randint(0, 65535)
+        reseed(seed)
+        # read by the parallel workers, which are started after this point
+        os.environ[TEST_SEED_ENV] = str(seed)
         print("Using seed: {}".format(seed))
         super().setup_test_environment(**kwargs)
+        self.password_hashers_override = fast_password_hashers()
+        self.password_hashers_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.password_hashers_override.disable()
+        super().teardown_test_environment(**kwargs)
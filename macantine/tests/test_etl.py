@@ -1,14 +1,18 @@
 import json
 import os
+import shutil
+import tempfile
 
 import pandas as pd
 import requests_mock
 from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.db import connection
 from django.test import TestCase, override_settings
 from freezegun import freeze_time
 
 from data.factories import CanteenFactory, DiagnosticFactory, SectorFactory, UserFactory
-from data.models import Teledeclaration
+from data.models import Sector, Teledeclaration
 from macantine.etl.analysis import (
     ETL_ANALYSIS,
     aggregate_col,
@@ -177,6 +181,14 @@ class TestETLAnalysis(TestCase):
 
 @requests_mock.Mocker()
 class TestETLOpenData(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The canteen ETL hides the police / army sector by its id. Reserve that id and move the sequence past it,
+        # otherwise a factory sector can get id 22 in a fresh (e.g. parallel worker) database and hide its canteen
+        cls.private_sector = SectorFactory.create(id=22, name="Restaurants des armées / police / gendarmerie")
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Sector]):
+                cursor.execute(sql)
 
     @freeze_time("2023-05-14")  # Faking time to mock creation_date
     def test_td_range_years(self, mock):
@@ -456,7 +468,7 @@ class TestETLOpenData(TestCase):
 
         # Testing the filtering of canteens from sector 22
         len_dataset_without_sector_22 = len(canteens)
-        CanteenFactory.create(sectors=[SectorFactory.create(id=22)])
+        CanteenFactory.create(sectors=[self.private_sector])
         etl_canteen.extract_dataset()
         etl_canteen.transform_dataset()
         canteens = etl_canteen.get_dataset()
@@ -585,16 +597,22 @@ class TestETLOpenData(TestCase):
         etl = ETL_CANTEEN()
         etl.dataset_name += "_test"  # Avoid interferring with other files
 
-        for tc in test_cases:
-            etl.df = tc["data"]
-            etl.load_dataset()
-            with default_storage.open(f"open_data/{etl.dataset_name}.csv", "r") as csv_file:
-                output_dataframe = pd.read_csv(csv_file, sep=";")
-            self.assertEqual(tc["expected_length"], len(output_dataframe))
-
-            self.assertTrue(default_storage.exists(f"open_data/{etl.dataset_name}.parquet"))
-            self.assertTrue(default_storage.exists(f"open_data/{etl.dataset_name}.xlsx"))
-
-            # Cleaning files
-            for file_extension in ["csv", "parquet", "xslx"]:
-                default_storage.delete(f"open_data/{etl.dataset_name}.{file_extension}")
+        # Export to a media root of its own, so that parallel workers and other runs never share the files
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        os.makedirs(os.path.join(media_root, "open_data"))
+
+        with override_settings(MEDIA_ROOT=media_root):
+            for tc in test_cases:
+                etl.df = tc["data"]
+                etl.load_dataset()
+                with default_storage.open(f"open_data/{etl.dataset_name}.csv", "r") as csv_file:
+                    output_dataframe = pd.read_csv(csv_file, sep=";")
+                self.assertEqual(tc["expected_length"], len(output_dataframe))
+
+                self.assertTrue(default_storage.exists(f"open_data/{etl.dataset_name}.parquet"))
+                self.assertTrue(default_storage.exists(f"open_data/{etl.dataset_name}.xlsx"))
+
+                # Cleaning files
+                for file_extension in ["csv", "parquet", "xlsx"]:
+                    default_storage.delete(f"open_data/{etl.dataset_name}.{file_extension}")